@@ -1,5 +1,7 @@
 import asyncio
 import logging
+import os
+import sys
 from urllib.parse import urljoin
 
 from aiogram import Bot, Dispatcher
@@ -23,6 +25,7 @@ from app.bot.utils.constants import (
     DEFAULT_LANGUAGE,
     I18N_DOMAIN,
     TELEGRAM_WEBHOOK,
+    TELEGRAM_WEBHOOK_MAX_CONNECTIONS,
 )
 from app.config import DEFAULT_BOT_HOST, DEFAULT_LOCALES_DIR, Config, load_config
 from app.db.database import Database
@@ -33,15 +36,32 @@ async def on_shutdown(db: Database, bot: Bot, services: ServicesContainer) -> No
     await commands.delete(bot)
     await bot.delete_webhook()
     await bot.session.close()
+    await services.transaction_writer.close()
     await db.close()
     logging.info("Bot stopped.")
 
 
-async def on_startup(config: Config, bot: Bot, services: ServicesContainer, db: Database) -> None:
+async def on_startup(
+    config: Config,
+    bot: Bot,
+    services: ServicesContainer,
+    db: Database,
+    dispatcher: Dispatcher,
+) -> None:
     webhook_url = urljoin(config.bot.DOMAIN, TELEGRAM_WEBHOOK)
-
-    if await bot.get_webhook_info() != webhook_url:
-        await bot.set_webhook(webhook_url)
+    allowed_updates = dispatcher.resolve_used_update_types()
+
+    webhook_info = await bot.get_webhook_info()
+    if (
+        webhook_info.url != webhook_url
+        or webhook_info.max_connections != TELEGRAM_WEBHOOK_MAX_CONNECTIONS
+        or sorted(webhook_info.allowed_updates or []) != sorted(allowed_updates)
+    ):
+        await bot.set_webhook(
+            url=webhook_url,
+            max_connections=TELEGRAM_WEBHOOK_MAX_CONNECTIONS,
+            allowed_updates=allowed_updates,
+        )
 
     current_webhook = await bot.get_webhook_info()
     logging.info(f"Current webhook URL: {current_webhook.url}")
@@ -102,6 +122,9 @@ async def main() -> None:
         services=services_container,
     )
 
+    # Resolve the bot identity once, handlers receive its username as workflow data
+    bot_username = (await bot.me()).username
+
     # Create the dispatcher
     dispatcher = Dispatcher(
         db=db,
@@ -110,6 +133,7 @@ async def main() -> None:
         bot=bot,
         services=services_container,
         gateway_factory=gateway_factory,
+        bot_username=bot_username,
     )
 
     # Register event handlers
@@ -141,7 +165,7 @@ async def main() -> None:
 
     # Set up application and run
     setup_application(app, dispatcher, bot=bot)
-    await _run_app(app, host=DEFAULT_BOT_HOST, port=config.bot.PORT)
+    await _run_app(app, host=DEFAULT_BOT_HOST, port=config.bot.PORT, access_log=None)
 
 
 if __name__ == "__main__":
@@ -149,3 +173,9 @@ if __name__ == "__main__":
         asyncio.run(main())
     except (KeyboardInterrupt, SystemExit):
         logging.info("Bot stopped.")
+
+    if routers.admin_tools.restart_handler.is_restart_requested():
+        # execv skips atexit, so write out the queued and buffered log records first
+        logger.stop_logging()
+        logging.shutdown()
+        os.execv(sys.executable, [sys.executable, *sys.argv])
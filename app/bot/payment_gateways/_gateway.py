@@ -1,3 +1,4 @@
+import asyncio
 import logging
 from abc import ABC, abstractmethod
 
@@ -51,6 +52,10 @@ class PaymentGateway(ABC):
         self.i18n = i18n
         self.services = services
 
+    async def _get_bot_username(self) -> str:
+        # Bot.me() caches the identity on the bot instance shared with the handlers
+        return (await self.bot.me()).username
+
     @abstractmethod
     async def create_payment(self, data: SubscriptionData) -> str:
         pass
@@ -64,19 +69,21 @@ class PaymentGateway(ABC):
         pass
 
     async def _on_payment_succeeded(self, payment_id: str) -> None:
-        logger.info(f"Payment succeeded {payment_id}")
+        logger.info("Payment succeeded %s", payment_id)
 
         async with self.session() as session:
-            transaction = await Transaction.get_by_id(session=session, payment_id=payment_id)
-            data = SubscriptionData.unpack(transaction.subscription)
-            logger.debug(f"Subscription data unpacked: {data}")
-            user = await User.get(session=session, tg_id=data.user_id)
-
-            await Transaction.update(
+            transaction = await Transaction.set_status(
                 session=session,
                 payment_id=payment_id,
                 status=TransactionStatus.COMPLETED,
             )
+            if not transaction:
+                # Raise so the caller's retry and alerting see a paid but unrecorded payment
+                raise Exception(f"Transaction {payment_id} not found for succeeded payment.")
+
+            data = SubscriptionData.unpack(transaction.subscription)
+            logger.debug("Subscription data unpacked: %s", data)
+            user = await User.get(session=session, tg_id=transaction.tg_id)
 
         if self.config.shop.REFERRER_REWARD_ENABLED:
             await self.services.referral.add_referrers_rewards_on_payment(
@@ -106,35 +113,40 @@ class PaymentGateway(ABC):
                 storage=self.storage,
             )
 
+            # Success notifications do not depend on the panel response, send them concurrently
             if data.is_extend:
-                await self.services.vpn.extend_subscription(
-                    user=user,
-                    devices=data.devices,
-                    duration=data.duration,
-                )
-                logger.info(f"Subscription extended for user {user.tg_id}")
-                await self.services.notification.notify_extend_success(
-                    user_id=user.tg_id,
-                    data=data,
+                await asyncio.gather(
+                    self.services.vpn.extend_subscription(
+                        user=user,
+                        devices=data.devices,
+                        duration=data.duration,
+                    ),
+                    self.services.notification.notify_extend_success(
+                        user_id=user.tg_id,
+                        data=data,
+                    ),
                 )
+                logger.info("Subscription extended for user %s", user.tg_id)
             elif data.is_change:
-                await self.services.vpn.change_subscription(
-                    user=user,
-                    devices=data.devices,
-                    duration=data.duration,
-                )
-                logger.info(f"Subscription changed for user {user.tg_id}")
-                await self.services.notification.notify_change_success(
-                    user_id=user.tg_id,
-                    data=data,
+                await asyncio.gather(
+                    self.services.vpn.change_subscription(
+                        user=user,
+                        devices=data.devices,
+                        duration=data.duration,
+                    ),
+                    self.services.notification.notify_change_success(
+                        user_id=user.tg_id,
+                        data=data,
+                    ),
                 )
+                logger.info("Subscription changed for user %s", user.tg_id)
             else:
                 await self.services.vpn.create_subscription(
                     user=user,
                     devices=data.devices,
                     duration=data.duration,
                 )
-                logger.info(f"Subscription created for user {user.tg_id}")
+                logger.info("Subscription created for user %s", user.tg_id)
                 key = await self.services.vpn.get_key(user)
                 await self.services.notification.notify_purchase_success(
                     user_id=user.tg_id,
@@ -142,16 +154,17 @@ class PaymentGateway(ABC):
                 )
 
     async def _on_payment_canceled(self, payment_id: str) -> None:
-        logger.info(f"Payment canceled {payment_id}")
+        logger.info("Payment canceled %s", payment_id)
         async with self.session() as session:
-            transaction = await Transaction.get_by_id(session=session, payment_id=payment_id)
-            data = SubscriptionData.unpack(transaction.subscription)
-
-            await Transaction.update(
+            transaction = await Transaction.set_status(
                 session=session,
                 payment_id=payment_id,
                 status=TransactionStatus.CANCELED,
             )
+            if not transaction:
+                return
+
+            data = SubscriptionData.unpack(transaction.subscription)
 
         await self.services.notification.notify_developer(
             text=EVENT_PAYMENT_CANCELED_TAG
@@ -19,7 +19,6 @@ from app.bot.payment_gateways import PaymentGateway
 from app.bot.utils.constants import CRYPTOMUS_WEBHOOK, Currency, TransactionStatus
 from app.bot.utils.navigation import NavSubscription
 from app.config import Config
-from app.db.models import Transaction
 
 logger = logging.getLogger(__name__)
 
@@ -52,7 +51,7 @@ class Cryptomus(PaymentGateway):
         logger.info("Cryptomus payment gateway initialized.")
 
     async def create_payment(self, data: SubscriptionData) -> str:
-        bot_username = (await self.bot.get_me()).username
+        bot_username = await self._get_bot_username()
         redirect_url = f"https://t.me/{bot_username}"
         order_id = str(uuid.uuid4())
         price = str(data.price)
@@ -82,14 +81,14 @@ class Cryptomus(PaymentGateway):
                 else:
                     raise Exception(f"Error: {response.status}; Result: {result}; Data: {data}")
 
-        async with self.session() as session:
-            await Transaction.create(
-                session=session,
-                tg_id=data.user_id,
-                subscription=data.pack(),
-                payment_id=result["result"]["order_id"],
-                status=TransactionStatus.PENDING,
-            )
+        is_created = await self.services.transaction_writer.submit(
+            tg_id=data.user_id,
+            subscription=data.pack(),
+            payment_id=result["result"]["order_id"],
+            status=TransactionStatus.PENDING,
+        )
+        if not is_created:
+            raise Exception(f"Error: transaction was not saved; Data: {data}")
 
         logger.info(f"Payment link created for user {data.user_id}: {pay_url}")
         return pay_url
@@ -1,5 +1,11 @@
+import asyncio
+import html
 import logging
+import uuid
+from functools import lru_cache
+from ipaddress import ip_address, ip_network
 
+import aiohttp
 from aiogram import Bot
 from aiogram.fsm.storage.redis import RedisStorage
 from aiogram.utils.i18n import I18n
@@ -7,26 +13,47 @@ from aiogram.utils.i18n import gettext as _
 from aiogram.utils.i18n import lazy_gettext as __
 from aiohttp.web import Application, Request, Response
 from sqlalchemy.ext.asyncio import async_sessionmaker
-from yookassa import Configuration, Payment
 from yookassa.domain.common import SecurityHelper
 from yookassa.domain.common.confirmation_type import ConfirmationType
-from yookassa.domain.models.receipt import Receipt, ReceiptItem
-from yookassa.domain.notification import (
-    WebhookNotificationEventType,
-    WebhookNotificationFactory,
-)
-from yookassa.domain.request.payment_request import PaymentRequest
+from yookassa.domain.notification import WebhookNotificationEventType
 
 from app.bot.models import ServicesContainer, SubscriptionData
 from app.bot.payment_gateways import PaymentGateway
-from app.bot.utils.constants import YOOKASSA_WEBHOOK, Currency, TransactionStatus
+from app.bot.utils.constants import (
+    EVENT_PAYMENT_FAILED_TAG,
+    YOOKASSA_WEBHOOK,
+    Currency,
+    TransactionStatus,
+)
 from app.bot.utils.formatting import format_device_count, format_subscription_period
 from app.bot.utils.navigation import NavSubscription
 from app.config import Config
-from app.db.models import Transaction
 
 logger = logging.getLogger(__name__)
 
+API_URL = "https://api.yookassa.ru"
+API_CONNECTIONS_LIMIT = 100
+API_KEEPALIVE_TIMEOUT = 60
+WEBHOOK_QUEUE_SIZE = 10_000
+WEBHOOK_WORKERS = 4
+WEBHOOK_MAX_ATTEMPTS = 5
+WEBHOOK_RETRY_DELAY = 5
+WEBHOOK_SHUTDOWN_TIMEOUT = 30
+HANDLED_EVENTS = {
+    WebhookNotificationEventType.PAYMENT_SUCCEEDED,
+    WebhookNotificationEventType.PAYMENT_CANCELED,
+}
+TRUSTED_NETWORKS = tuple(ip_network(network) for network in SecurityHelper.YOOKASSA_NETWORKS)
+
+
+@lru_cache(maxsize=4096)
+def is_ip_trusted(ip: str | None) -> bool:
+    try:
+        address = ip_address(ip)
+    except ValueError:
+        return False
+    return any(address in network for network in TRUSTED_NETWORKS)
+
 
 class Yookassa(PaymentGateway):
     name = ""
@@ -52,12 +79,26 @@ class Yookassa(PaymentGateway):
         self.i18n = i18n
         self.services = services
 
-        Configuration.configure(self.config.yookassa.SHOP_ID, self.config.yookassa.TOKEN)
+        self._http = aiohttp.ClientSession(
+            base_url=API_URL,
+            auth=aiohttp.BasicAuth(str(self.config.yookassa.SHOP_ID), self.config.yookassa.TOKEN),
+            connector=aiohttp.TCPConnector(
+                limit=API_CONNECTIONS_LIMIT,
+                keepalive_timeout=API_KEEPALIVE_TIMEOUT,
+            ),
+        )
+        self._queue: asyncio.Queue[tuple[str, str, int]] = asyncio.Queue(
+            maxsize=WEBHOOK_QUEUE_SIZE
+        )
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(WEBHOOK_WORKERS)]
+        self._retries: dict[asyncio.TimerHandle, str] = {}
+
         self.app.router.add_post(YOOKASSA_WEBHOOK, self.webhook_handler)
+        self.app.on_shutdown.append(self._on_shutdown)
         logger.info("YooKassa payment gateway initialized.")
 
     async def create_payment(self, data: SubscriptionData) -> str:
-        bot_username = (await self.bot.get_me()).username
+        bot_username = await self._get_bot_username()
         redirect_url = f"https://t.me/{bot_username}"
 
         description = _("payment:invoice:description").format(
@@ -67,40 +108,45 @@ class Yookassa(PaymentGateway):
 
         price = str(data.price)
 
-        receipt = Receipt(
-            customer={"email": self.config.shop.EMAIL},
-            items=[
-                ReceiptItem(
-                    description=description,
-                    quantity=1,
-                    amount={"value": price, "currency": self.currency.code},
-                    vat_code=1,
-                )
-            ],
-        )
+        amount = {"value": price, "currency": self.currency.code}
 
-        request = PaymentRequest(
-            amount={"value": price, "currency": self.currency.code},
-            confirmation={"type": ConfirmationType.REDIRECT, "return_url": redirect_url},
-            capture=True,
-            save_payment_method=False,
-            description=description,
-            receipt=receipt,
-        )
+        payload = {
+            "amount": amount,
+            "confirmation": {"type": ConfirmationType.REDIRECT, "return_url": redirect_url},
+            "capture": True,
+            "save_payment_method": False,
+            "description": description,
+            "receipt": {
+                "customer": {"email": self.config.shop.EMAIL},
+                "items": [
+                    {
+                        "description": description,
+                        "quantity": 1,
+                        "amount": amount,
+                        "vat_code": 1,
+                    }
+                ],
+            },
+        }
+        headers = {"Idempotence-Key": str(uuid.uuid4())}
 
-        response = Payment.create(request)
+        async with self._http.post("/v3/payments", json=payload, headers=headers) as response:
+            result = await response.json()
+            if response.status == 200 and result.get("confirmation", {}).get("confirmation_url"):
+                pay_url = result["confirmation"]["confirmation_url"]
+            else:
+                raise Exception(f"Error: {response.status}; Result: {result}; Data: {data}")
 
-        async with self.session() as session:
-            await Transaction.create(
-                session=session,
-                tg_id=data.user_id,
-                subscription=data.pack(),
-                payment_id=response.id,
-                status=TransactionStatus.PENDING,
-            )
+        is_created = await self.services.transaction_writer.submit(
+            tg_id=data.user_id,
+            subscription=data.pack(),
+            payment_id=result["id"],
+            status=TransactionStatus.PENDING,
+        )
+        if not is_created:
+            raise Exception(f"Error: transaction was not saved; Data: {data}")
 
-        pay_url = response.confirmation["confirmation_url"]
-        logger.info(f"Payment link created for user {data.user_id}: {pay_url}")
+        logger.info("Payment link created for user %s: %s", data.user_id, pay_url)
         return pay_url
 
     async def handle_payment_succeeded(self, payment_id: str) -> None:
@@ -112,27 +158,102 @@ class Yookassa(PaymentGateway):
     async def webhook_handler(self, request: Request) -> Response:
         ip = request.headers.get("X-Forwarded-For", request.remote)
 
-        if not SecurityHelper().is_ip_trusted(ip):
+        if not is_ip_trusted(ip):
             return Response(status=403)
 
         try:
             event_json = await request.json()
-            notification_object = WebhookNotificationFactory().create(event_json)
-            response_object = notification_object.object
-            payment_id = response_object.id
+            event = event_json.get("event")
+            payment_id = event_json.get("object", {}).get("id")
 
-            match notification_object.event:
-                case WebhookNotificationEventType.PAYMENT_SUCCEEDED:
-                    await self.handle_payment_succeeded(payment_id)
-                    return Response(status=200)
+            if event not in HANDLED_EVENTS or not payment_id:
+                return Response(status=400)
 
-                case WebhookNotificationEventType.PAYMENT_CANCELED:
-                    await self.handle_payment_canceled(payment_id)
-                    return Response(status=200)
+            self._queue.put_nowait((event, payment_id, 1))
+            return Response(status=200)
 
-                case _:
-                    return Response(status=400)
+        except asyncio.QueueFull:
+            logger.error("YooKassa webhook queue is full, notification will be redelivered.")
+            return Response(status=503)
 
         except Exception as exception:
-            logger.exception(f"Error processing YooKassa webhook: {exception}")
+            logger.exception("Error processing YooKassa webhook: %s", exception)
             return Response(status=400)
+
+    async def _worker(self) -> None:
+        while True:
+            event, payment_id, attempt = await self._queue.get()
+            try:
+                match event:
+                    case WebhookNotificationEventType.PAYMENT_SUCCEEDED:
+                        await self.handle_payment_succeeded(payment_id)
+                    case WebhookNotificationEventType.PAYMENT_CANCELED:
+                        await self.handle_payment_canceled(payment_id)
+            except Exception as exception:
+                logger.exception(
+                    "Error handling YooKassa event %s for %s (attempt %s/%s): %s",
+                    event,
+                    payment_id,
+                    attempt,
+                    WEBHOOK_MAX_ATTEMPTS,
+                    exception,
+                )
+                # The webhook was already acknowledged, so YooKassa will not redeliver it
+                if attempt < WEBHOOK_MAX_ATTEMPTS:
+                    self._schedule_retry(event, payment_id, attempt)
+                else:
+                    await self._notify_failure(event, payment_id, exception)
+            finally:
+                self._queue.task_done()
+
+    def _schedule_retry(self, event: str, payment_id: str, attempt: int) -> None:
+        def requeue() -> None:
+            self._retries.pop(handle, None)
+            try:
+                self._queue.put_nowait((event, payment_id, attempt + 1))
+            except asyncio.QueueFull:
+                self._schedule_retry(event, payment_id, attempt)
+
+        delay = WEBHOOK_RETRY_DELAY * 2 ** (attempt - 1)
+        handle = asyncio.get_running_loop().call_later(delay, requeue)
+        self._retries[handle] = payment_id
+
+    async def _notify_failure(self, event: str, payment_id: str, exception: Exception) -> None:
+        try:
+            await self.services.notification.notify_developer(
+                text=f"{EVENT_PAYMENT_FAILED_TAG}\n\n"
+                f"YooKassa event {event} for payment {payment_id} was not processed "
+                f"after {WEBHOOK_MAX_ATTEMPTS} attempts: {html.escape(str(exception))}",
+            )
+        except Exception as notify_exception:
+            logger.error("Failed to notify developer about %s: %s", payment_id, notify_exception)
+
+    async def _on_shutdown(self, app: Application) -> None:
+        try:
+            await asyncio.wait_for(self._queue.join(), WEBHOOK_SHUTDOWN_TIMEOUT)
+        except asyncio.TimeoutError:
+            dropped = []
+            while not self._queue.empty():
+                event, payment_id, _attempt = self._queue.get_nowait()
+                self._queue.task_done()
+                dropped.append(f"{event}:{payment_id}")
+            logger.error(
+                "YooKassa webhook queue not drained in %ss, dropping events: %s",
+                WEBHOOK_SHUTDOWN_TIMEOUT,
+                ", ".join(dropped),
+            )
+
+        if self._retries:
+            logger.error(
+                "Dropping pending YooKassa event retries for payments: %s",
+                ", ".join(self._retries.values()),
+            )
+        for handle in self._retries:
+            handle.cancel()
+        self._retries.clear()
+
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        await self._http.close()
+        logger.info("YooKassa webhook workers stopped.")
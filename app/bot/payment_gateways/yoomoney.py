@@ -17,7 +17,6 @@ from app.bot.utils.constants import YOOMONEY_WEBHOOK, Currency, TransactionStatu
 from app.bot.utils.formatting import format_device_count, format_subscription_period
 from app.bot.utils.navigation import NavSubscription
 from app.config import Config
-from app.db.models import Transaction
 
 logger = logging.getLogger(__name__)
 
@@ -50,7 +49,7 @@ class Yoomoney(PaymentGateway):
         logger.info("YooMoney payment gateway initialized.")
 
     async def create_payment(self, data: SubscriptionData) -> str:
-        bot_username = (await self.bot.get_me()).username
+        bot_username = await self._get_bot_username()
         redirect_url = f"https://t.me/{bot_username}"
 
         description = _("payment:invoice:description").format(
@@ -71,14 +70,14 @@ class Yoomoney(PaymentGateway):
             successURL=redirect_url,
         )
 
-        async with self.session() as session:
-            await Transaction.create(
-                session=session,
-                tg_id=data.user_id,
-                subscription=data.pack(),
-                payment_id=payment_id,
-                status=TransactionStatus.PENDING,
-            )
+        is_created = await self.services.transaction_writer.submit(
+            tg_id=data.user_id,
+            subscription=data.pack(),
+            payment_id=payment_id,
+            status=TransactionStatus.PENDING,
+        )
+        if not is_created:
+            raise Exception(f"Error: transaction was not saved; Data: {data}")
 
         logger.info(f"Payment link created for user {data.user_id}: {pay_url}")
         return pay_url
@@ -59,6 +59,7 @@ async def handle_invite_input(
     session: AsyncSession,
     state: FSMContext,
     services: ServicesContainer,
+    bot_username: str,
 ) -> None:
     invite_name = message.text.strip()
     logger.info(f"Admin {user.tg_id} entered invite name: {invite_name}")
@@ -68,7 +69,6 @@ async def handle_invite_input(
 
     try:
         invite = await Invite.create(session=session, name=invite_name)
-        bot_username = (await message.bot.get_me()).username
         invite_link = f"https://t.me/{bot_username}?start={invite.hash_code}"
 
         await state.set_state(None)
@@ -130,6 +130,7 @@ async def callback_invite_details(
     session: AsyncSession,
     services: ServicesContainer,
     gateway_factory: GatewayFactory,
+    bot_username: str,
 ) -> None:
     invite_id = int(callback.data.split("_")[3])
     invite = await session.get(Invite, invite_id)
@@ -143,7 +144,6 @@ async def callback_invite_details(
 
     logger.info(f"Admin {user.tg_id} is checking invite {invite.name}.")
 
-    bot_username = (await callback.bot.get_me()).username
     invite_link = f"https://t.me/{bot_username}?start={invite.hash_code}"
 
     status = (
@@ -201,6 +201,7 @@ async def callback_toggle_invite(
     session: AsyncSession,
     services: ServicesContainer,
     gateway_factory: GatewayFactory,
+    bot_username: str,
 ) -> None:
     invite_id = int(callback.data.split("_")[3])
     invite = await session.get(Invite, invite_id)
@@ -234,6 +235,7 @@ async def callback_toggle_invite(
         session=session,
         services=services,
         gateway_factory=gateway_factory,
+        bot_username=bot_username,
     )
 
 
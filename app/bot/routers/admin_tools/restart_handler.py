@@ -1,6 +1,5 @@
 import logging
-import os
-import sys
+import signal
 
 from aiogram import F, Router
 from aiogram.types import CallbackQuery, User
@@ -14,6 +13,12 @@ from app.db.models import User
 logger = logging.getLogger(__name__)
 router = Router(name=__name__)
 
+_restart_requested = False
+
+
+def is_restart_requested() -> bool:
+    return _restart_requested
+
 
 @router.callback_query(F.data == NavAdminTools.RESTART_BOT, IsAdmin())
 async def callback_restart_bot(
@@ -28,4 +33,7 @@ async def callback_restart_bot(
         text=_("restart_bot:popup:process"),
     )
 
-    os.execv(sys.executable, [sys.executable, *sys.argv])
+    # Stop gracefully so shutdown hooks run; the process is re-executed after the loop exits
+    global _restart_requested
+    _restart_requested = True
+    signal.raise_signal(signal.SIGTERM)
@@ -12,9 +12,11 @@ from app.bot.utils.constants import (
     APP_WINDOWS_SCHEME,
     CONNECTION_WEBHOOK,
 )
+from app.bot.utils.misc import locale_cache
 from app.bot.utils.navigation import NavDownload, NavMain, NavSubscription, NavSupport
 
 
+@locale_cache()
 def platforms_keyboard(previous_callback: str = None) -> InlineKeyboardMarkup:
     builder = InlineKeyboardBuilder()
 
@@ -42,9 +44,8 @@ def platforms_keyboard(previous_callback: str = None) -> InlineKeyboardMarkup:
     return builder.as_markup()
 
 
-def download_keyboard(platform: NavDownload, url: str, key: str) -> InlineKeyboardMarkup:
-    builder = InlineKeyboardBuilder()
-
+@locale_cache()
+def _download_keyboard_template(platform: NavDownload) -> tuple[InlineKeyboardButton, str, str]:
     match platform:
         case NavDownload.PLATFORM_IOS:
             scheme = APP_IOS_SCHEME
@@ -56,15 +57,27 @@ def download_keyboard(platform: NavDownload, url: str, key: str) -> InlineKeyboa
             scheme = APP_WINDOWS_SCHEME
             download = APP_WINDOWS_LINK
 
-    connect = f"{url}{CONNECTION_WEBHOOK}?scheme={scheme}&key={key}"
+    download_button = InlineKeyboardButton(text=_("download:button:download"), url=download)
+    return download_button, _("download:button:connect"), scheme
 
-    builder.button(text=_("download:button:download"), url=download)
 
-    builder.button(
-        text=_("download:button:connect"),
-        url=connect if key else None,
-        callback_data=NavSubscription.MAIN if not key else None,
-    )
+def download_keyboard(platform: NavDownload, url: str, key: str) -> InlineKeyboardMarkup:
+    download_button, connect_text, scheme = _download_keyboard_template(platform)
 
-    builder.row(back_button(NavDownload.MAIN))
-    return builder.as_markup()
+    if key:
+        connect_button = InlineKeyboardButton(
+            text=connect_text,
+            url=f"{url}{CONNECTION_WEBHOOK}?scheme={scheme}&key={key}",
+        )
+    else:
+        connect_button = InlineKeyboardButton(
+            text=connect_text,
+            callback_data=NavSubscription.MAIN,
+        )
+
+    return InlineKeyboardMarkup(
+        inline_keyboard=[
+            [download_button, connect_button],
+            [back_button(NavDownload.MAIN)],
+        ]
+    )
@@ -1,3 +1,4 @@
+import asyncio
 import logging
 
 from aiogram import Bot, F, Router
@@ -12,6 +13,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from app.bot.filters import IsAdmin
 from app.bot.models import ServicesContainer
 from app.bot.utils.constants import MAIN_MESSAGE_ID_KEY
+from app.bot.utils.misc import locale_cache
 from app.bot.utils.navigation import NavMain
 from app.config import Config
 from app.db.models import Invite, Referral, User
@@ -22,6 +24,26 @@ logger = logging.getLogger(__name__)
 router = Router(name=__name__)
 
 
+@locale_cache(maxsize=32)
+def _main_message_template() -> str:
+    return _("main_menu:message:main")
+
+
+def prepare_message(user: User) -> str:
+    return _main_message_template().format(name=user.first_name)
+
+
+_background_tasks: set[asyncio.Task] = set()
+
+
+async def delete_main_message(bot: Bot, user: User, message_id: int) -> None:
+    try:
+        await bot.delete_message(chat_id=user.tg_id, message_id=message_id)
+        logger.debug(f"Main message for user {user.tg_id} deleted.")
+    except Exception as exception:
+        logger.error(f"Failed to delete main message for user {user.tg_id}: {exception}")
+
+
 async def process_invite_attribution(session: AsyncSession, user: User, invite_hash: str) -> bool:
     logger.info(f"Checking invite {invite_hash} for user {user.tg_id}")
     try:
@@ -82,13 +104,7 @@ async def command_main_menu(
     previous_message_id = await state.get_value(MAIN_MESSAGE_ID_KEY)
 
     if previous_message_id:
-        try:
-            await message.bot.delete_message(chat_id=user.tg_id, message_id=previous_message_id)
-            logger.debug(f"Main message for user {user.tg_id} deleted.")
-        except Exception as exception:
-            logger.error(f"Failed to delete main message for user {user.tg_id}: {exception}")
-        finally:
-            await state.clear()
+        await state.clear()
 
     if command.args and is_new_user:
         if command.args.isdigit():
@@ -100,7 +116,7 @@ async def command_main_menu(
 
     is_admin = await IsAdmin()(user_id=user.tg_id)
     main_menu = await message.answer(
-        text=_("main_menu:message:main").format(name=user.first_name),
+        text=prepare_message(user),
         reply_markup=main_menu_keyboard(
             is_admin,
             is_referral_available=config.shop.REFERRER_REWARD_ENABLED,
@@ -110,6 +126,14 @@ async def command_main_menu(
     )
     await state.update_data({MAIN_MESSAGE_ID_KEY: main_menu.message_id})
 
+    # Delete the previous menu only after the new one is shown, without waiting for Telegram
+    if previous_message_id:
+        task = asyncio.create_task(
+            delete_main_message(bot=message.bot, user=user, message_id=previous_message_id)
+        )
+        _background_tasks.add(task)
+        task.add_done_callback(_background_tasks.discard)
+
 
 @router.callback_query(F.data == NavMain.MAIN_MENU)
 async def callback_main_menu(
@@ -123,16 +147,21 @@ async def callback_main_menu(
     await state.clear()
     await state.update_data({MAIN_MESSAGE_ID_KEY: callback.message.message_id})
     is_admin = await IsAdmin()(user_id=user.tg_id)
-    await callback.message.edit_text(
-        text=_("main_menu:message:main").format(name=user.first_name),
-        reply_markup=main_menu_keyboard(
-            is_admin,
-            is_referral_available=config.shop.REFERRER_REWARD_ENABLED,
-            is_trial_available=await services.subscription.is_trial_available(user),
-            is_referred_trial_available=await services.referral.is_referred_trial_available(user),
-        ),
+    text = prepare_message(user)
+    reply_markup = main_menu_keyboard(
+        is_admin,
+        is_referral_available=config.shop.REFERRER_REWARD_ENABLED,
+        is_trial_available=await services.subscription.is_trial_available(user),
+        is_referred_trial_available=await services.referral.is_referred_trial_available(user),
     )
 
+    # Telegram rejects edits that change nothing, so skip the API call altogether
+    if callback.message.html_text == text and callback.message.reply_markup == reply_markup:
+        await callback.answer()
+        return
+
+    await callback.message.edit_text(text=text, reply_markup=reply_markup)
+
 
 async def redirect_to_main_menu(
     bot: Bot,
@@ -155,7 +184,7 @@ async def redirect_to_main_menu(
 
     try:
         await bot.edit_message_text(
-            text=_("main_menu:message:main").format(name=user.first_name),
+            text=prepare_message(user),
             chat_id=user.tg_id,
             message_id=main_message_id,
             reply_markup=main_menu_keyboard(
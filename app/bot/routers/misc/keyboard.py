@@ -2,6 +2,7 @@ from aiogram.types import InlineKeyboardButton, InlineKeyboardMarkup
 from aiogram.utils.i18n import gettext as _
 from aiogram.utils.keyboard import InlineKeyboardBuilder
 
+from app.bot.utils.misc import locale_cache
 from app.bot.utils.navigation import NavMain
 
 
@@ -12,6 +13,7 @@ def close_notification_button() -> InlineKeyboardButton:
     )
 
 
+@locale_cache()
 def close_notification_keyboard() -> InlineKeyboardMarkup:
     builder = InlineKeyboardBuilder()
     builder.row(close_notification_button())
@@ -24,6 +26,7 @@ def back_button(callback: str, text: str | None = None) -> InlineKeyboardButton:
     return InlineKeyboardButton(text=text, callback_data=callback)
 
 
+@locale_cache()
 def back_keyboard(callback: str) -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(inline_keyboard=[[back_button(callback)]])
 
@@ -35,6 +38,7 @@ def back_to_main_menu_button() -> InlineKeyboardButton:
     )
 
 
+@locale_cache()
 def back_to_main_menu_keyboard() -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(inline_keyboard=[[back_to_main_menu_button()]])
 
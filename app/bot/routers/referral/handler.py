@@ -106,11 +106,10 @@ async def callback_referral(
     state: FSMContext,
     session: AsyncSession,
     config: Config,
+    bot_username: str,
 ) -> None:
     logger.info(f"User {user.tg_id} opened referral page.")
 
-    bot_username = (await callback.bot.get_me()).username
-
     await state.update_data({PREVIOUS_CALLBACK_KEY: NavReferral.MAIN})
 
     await callback.message.edit_text(
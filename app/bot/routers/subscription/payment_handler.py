@@ -5,7 +5,6 @@ from aiogram.fsm.context import FSMContext
 from aiogram.fsm.state import State, StatesGroup
 from aiogram.types import CallbackQuery, Message, PreCheckoutQuery
 from aiogram.utils.i18n import gettext as _
-from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.bot.filters.is_dev import IsDev
 from app.bot.models import ServicesContainer, SubscriptionData
@@ -13,7 +12,7 @@ from app.bot.payment_gateways import GatewayFactory
 from app.bot.utils.constants import TransactionStatus
 from app.bot.utils.formatting import format_subscription_period
 from app.bot.utils.navigation import NavSubscription
-from app.db.models import Transaction, User
+from app.db.models import User
 
 from .keyboard import pay_keyboard
 
@@ -36,7 +35,7 @@ async def callback_payment_method_selected(
     state: FSMContext,
 ) -> None:
     if await state.get_state() == PaymentState.processing:
-        logger.debug(f"User {user.tg_id} is already processing payment.")
+        logger.debug("User %s is already processing payment.", user.tg_id)
         return
 
     await state.set_state(PaymentState.processing)
@@ -45,8 +44,8 @@ async def callback_payment_method_selected(
         method = callback_data.state
         devices = callback_data.devices
         duration = callback_data.duration
-        logger.info(f"User {user.tg_id} selected payment method: {method}")
-        logger.info(f"User {user.tg_id} selected {devices} devices and {duration} days.")
+        logger.info("User %s selected payment method: %s", user.tg_id, method)
+        logger.info("User %s selected %s devices and %s days.", user.tg_id, devices, duration)
         gateway = gateway_factory.get_gateway(method)
         plan = services.plan.get_plan(devices)
         price = plan.get_price(currency=gateway.currency, duration=duration)
@@ -71,7 +70,7 @@ async def callback_payment_method_selected(
             reply_markup=pay_keyboard(pay_url=pay_url, callback_data=callback_data),
         )
     except Exception as exception:
-        logger.error(f"Error processing payment: {exception}")
+        logger.error("Error processing payment: %s", exception)
         await services.notification.show_popup(callback=callback, text=_("payment:popup:error"))
     finally:
         await state.set_state(None)
@@ -79,7 +78,7 @@ async def callback_payment_method_selected(
 
 @router.pre_checkout_query()
 async def pre_checkout_handler(pre_checkout_query: PreCheckoutQuery, user: User) -> None:
-    logger.info(f"Pre-checkout query received from user {user.tg_id}")
+    logger.info("Pre-checkout query received from user %s", user.tg_id)
     if pre_checkout_query.invoice_payload:
         await pre_checkout_query.answer(ok=True)
     else:
@@ -90,7 +89,7 @@ async def pre_checkout_handler(pre_checkout_query: PreCheckoutQuery, user: User)
 async def successful_payment(
     message: Message,
     user: User,
-    session: AsyncSession,
+    services: ServicesContainer,
     bot: Bot,
     gateway_factory: GatewayFactory,
 ) -> None:
@@ -100,14 +99,18 @@ async def successful_payment(
             telegram_payment_charge_id=message.successful_payment.telegram_payment_charge_id,
         )
 
-    data = SubscriptionData.unpack(message.successful_payment.invoice_payload)
-    transaction = await Transaction.create(
-        session=session,
+    # The invoice payload is already the packed SubscriptionData, store it as is
+    payment_id = message.successful_payment.telegram_payment_charge_id
+    is_created = await services.transaction_writer.submit(
         tg_id=user.tg_id,
-        subscription=data.pack(),
-        payment_id=message.successful_payment.telegram_payment_charge_id,
+        subscription=message.successful_payment.invoice_payload,
+        payment_id=payment_id,
         status=TransactionStatus.COMPLETED,
     )
 
+    if not is_created:
+        logger.error("Transaction %s was not recorded, skipping payment handling.", payment_id)
+        return
+
     gateway = gateway_factory.get_gateway(NavSubscription.PAY_TELEGRAM_STARS)
-    await gateway.handle_payment_succeeded(payment_id=transaction.payment_id)
+    await gateway.handle_payment_succeeded(payment_id=payment_id)
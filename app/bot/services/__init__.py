@@ -11,6 +11,7 @@ from .plan import PlanService
 from .referral import ReferralService
 from .server_pool import ServerPoolService
 from .subscription import SubscriptionService
+from .transaction_writer import TransactionWriterService
 from .vpn import VPNService
 
 
@@ -27,6 +28,8 @@ async def initialize(
     subscription = SubscriptionService(config=config, session_factory=session, vpn_service=vpn)
     payment_stats = PaymentStatsService(session_factory=session)
     invite_stats = InviteStatsService(session_factory=session, payment_stats_service=payment_stats)
+    transaction_writer = TransactionWriterService(session_factory=session)
+    transaction_writer.start()
 
     return ServicesContainer(
         server_pool=server_pool,
@@ -37,4 +40,5 @@ async def initialize(
         subscription=subscription,
         payment_stats=payment_stats,
         invite_stats=invite_stats,
+        transaction_writer=transaction_writer,
     )
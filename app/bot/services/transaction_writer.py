@@ -0,0 +1,203 @@
+import asyncio
+import logging
+from typing import Any
+
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.db.models import Transaction
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 200
+FLUSH_INTERVAL = 0.05
+MAX_RETRIES = 3
+
+PendingRow = tuple[dict[str, Any], asyncio.Future]
+
+
+class TransactionWriterService:
+    """Buffers transaction inserts and writes them to the database in batches."""
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker,
+        batch_size: int = BATCH_SIZE,
+        flush_interval: float = FLUSH_INTERVAL,
+    ) -> None:
+        """
+        Initialize TransactionWriterService.
+
+        Args:
+            session_factory: SQLAlchemy async session maker
+            batch_size: Maximum number of rows written in one INSERT
+            flush_interval: Seconds to wait for more rows before flushing a partial batch
+        """
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: asyncio.Queue[PendingRow | None] = asyncio.Queue()
+        self._retry: list[PendingRow] = []
+        self._batch: list[PendingRow] = []
+        self._task: asyncio.Task | None = None
+        self._closing = False
+        logger.info("Transaction Writer Service initialized.")
+
+    def start(self) -> None:
+        if self._task is None:
+            self._closing = False
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        if self._task is None:
+            return
+
+        self._closing = True
+        self._queue.put_nowait(None)
+        try:
+            await self._task
+        except Exception as exception:
+            logger.error(f"Transaction Writer Service stopped with an error: {exception}")
+        self._task = None
+        logger.info("Transaction Writer Service stopped.")
+
+    async def submit(self, payment_id: str, **kwargs: Any) -> bool:
+        """
+        Queue a transaction for insertion and wait until its batch is committed.
+
+        Args:
+            payment_id: Unique payment identifier
+            **kwargs: Remaining Transaction column values
+
+        Returns:
+            bool: True if the transaction was written, False otherwise
+        """
+        if self._closing or self._task is None or self._task.done():
+            logger.error(f"Transaction Writer Service is not running, {payment_id} not written.")
+            return False
+
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait(({"payment_id": payment_id, **kwargs}, future))
+        return await future
+
+    async def _collect(self) -> tuple[list[PendingRow], bool]:
+        batch, self._retry = self._retry, []
+        self._batch = batch
+
+        # A batch closes once it is full or flush_interval after its first row, whichever is first
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.flush_interval if batch else None
+        while len(batch) < self.batch_size:
+            try:
+                if deadline is not None:
+                    timeout = max(0, deadline - loop.time())
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                else:
+                    item = await self._queue.get()
+            except asyncio.TimeoutError:
+                break
+
+            if item is None:
+                return batch, True
+            batch.append(item)
+            if deadline is None:
+                deadline = loop.time() + self.flush_interval
+
+        return batch, False
+
+    async def _run(self) -> None:
+        attempt = 0
+        closing = False
+        try:
+            while not closing or self._retry:
+                if closing:
+                    batch, self._retry = self._retry, []
+                else:
+                    batch, closing = await self._collect()
+
+                if not batch:
+                    continue
+
+                self._batch = batch
+                try:
+                    written = await self._flush(batch, attempt=attempt)
+                except Exception as exception:
+                    logger.error(f"Failed to write {len(batch)} transactions: {exception}")
+                    self._resolve(batch, False)
+                    written = True
+                self._batch = []
+
+                if written:
+                    attempt = 0
+                else:
+                    attempt += 1
+                    await asyncio.sleep(self.flush_interval * attempt)
+        finally:
+            # Never leave a submitter waiting on a writer that is gone
+            self._closing = True
+            self._fail_pending()
+
+    def _fail_pending(self) -> None:
+        pending = self._batch + self._retry
+        self._batch, self._retry = [], []
+        while not self._queue.empty():
+            item = self._queue.get_nowait()
+            if item is not None:
+                pending.append(item)
+
+        if pending:
+            logger.error(f"Transaction Writer Service stopped with {len(pending)} unwritten rows.")
+        self._resolve(pending, False)
+
+    async def _flush(self, batch: list[PendingRow], attempt: int) -> bool:
+        rows = [row for row, _ in batch]
+
+        async with self.session_factory() as session:
+            try:
+                await session.execute(insert(Transaction), rows)
+                await session.commit()
+            except IntegrityError as exception:
+                await session.rollback()
+                logger.warning(f"Batch of {len(rows)} transactions rejected: {exception}")
+                await self._flush_each(batch)
+                return True
+            except Exception as exception:
+                await session.rollback()
+                if attempt < MAX_RETRIES:
+                    logger.error(f"Failed to write {len(rows)} transactions, requeued: {exception}")
+                    self._retry = batch
+                    return False
+
+                logger.error(f"Failed to write {len(rows)} transactions: {exception}")
+                self._resolve(batch, False)
+                return True
+
+        logger.debug(f"Batch of {len(rows)} transactions written.")
+        self._resolve(batch, True)
+        return True
+
+    async def _flush_each(self, batch: list[PendingRow]) -> None:
+        async with self.session_factory() as session:
+            for row, future in batch:
+                try:
+                    await session.execute(insert(Transaction), [row])
+                    await session.commit()
+                    logger.info(f"Transaction {row['payment_id']} created.")
+                    result = True
+                except Exception as exception:
+                    await session.rollback()
+                    logger.error(
+                        f"Error occurred while creating transaction {row['payment_id']}: "
+                        f"{exception}"
+                    )
+                    result = False
+
+                if not future.done():
+                    future.set_result(result)
+
+    @staticmethod
+    def _resolve(batch: list[PendingRow], result: bool) -> None:
+        for _, future in batch:
+            if not future.done():
+                future.set_result(result)
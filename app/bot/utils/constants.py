@@ -34,6 +34,7 @@ CRYPTOMUS_WEBHOOK = "/cryptomus"  # Webhook path for receiving Cryptomus payment
 HELEKET_WEBHOOK = "/heleket"  # Webhook path for receiving Heleket payment notifications
 YOOKASSA_WEBHOOK = "/yookassa"  # Webhook path for receiving Yookassa payment notifications
 YOOMONEY_WEBHOOK = "/yoomoney"  # Webhook path for receiving Yoomoney payment notifications
+TELEGRAM_WEBHOOK_MAX_CONNECTIONS = 100  # Parallel connections Telegram may open to the webhook
 # endregion
 
 # region: Notification tags
@@ -42,6 +43,7 @@ BOT_STOPPED_TAG = "#BotStopped"
 BACKUP_CREATED_TAG = "#BackupCreated"
 EVENT_PAYMENT_SUCCEEDED_TAG = "#EventPaymentSucceeded"
 EVENT_PAYMENT_CANCELED_TAG = "#EventPaymentCanceled"
+EVENT_PAYMENT_FAILED_TAG = "#EventPaymentFailed"
 # endregion
 
 # region: I18n settings
@@ -54,6 +56,7 @@ UNLIMITED = "∞"
 DB_FORMAT = "sqlite3"
 LOG_ZIP_ARCHIVE_FORMAT = "zip"
 LOG_GZ_ARCHIVE_FORMAT = "gz"
+LOG_ZSTD_ARCHIVE_FORMAT = "zstd"
 MESSAGE_EFFECT_IDS = {
     "🔥": "5104841245755180586",
     "👍": "5107584321108051014",
@@ -3,6 +3,10 @@ import secrets
 import string
 import uuid
 from datetime import datetime
+from functools import lru_cache, wraps
+from typing import Callable
+
+from aiogram.utils.i18n import get_i18n
 
 CHARSET = string.ascii_uppercase + string.digits
 
@@ -31,3 +35,25 @@ def generate_hash(text: str, length: int = 8) -> str:
     result += secrets.choice(string.ascii_lowercase)
 
     return result
+
+
+def locale_cache(maxsize: int = 256) -> Callable:
+    """
+    Cache the result of a function per current locale and arguments.
+    Intended for keyboards whose content depends only on translations and arguments.
+    Call `cache_clear()` on the decorated function after reloading translations.
+    """
+
+    def decorator(func: Callable) -> Callable:
+        @lru_cache(maxsize=maxsize)
+        def cached(locale: str, *args, **kwargs):
+            return func(*args, **kwargs)
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            return cached(get_i18n().current_locale, *args, **kwargs)
+
+        wrapper.cache_clear = cached.cache_clear
+        return wrapper
+
+    return decorator
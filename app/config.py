@@ -10,6 +10,7 @@ from app.bot.utils.constants import (
     DB_FORMAT,
     LOG_GZ_ARCHIVE_FORMAT,
     LOG_ZIP_ARCHIVE_FORMAT,
+    LOG_ZSTD_ARCHIVE_FORMAT,
     Currency,
     ReferrerRewardType,
 )
@@ -384,7 +385,7 @@ def load_config() -> Config:
                 "LOG_ARCHIVE_FORMAT",
                 default=DEFAULT_LOG_ARCHIVE_FORMAT,
                 validate=OneOf(
-                    [LOG_ZIP_ARCHIVE_FORMAT, LOG_GZ_ARCHIVE_FORMAT],
+                    [LOG_ZIP_ARCHIVE_FORMAT, LOG_GZ_ARCHIVE_FORMAT, LOG_ZSTD_ARCHIVE_FORMAT],
                     error="LOG_ARCHIVE_FORMAT must be one of: {choices}",
                 ),
             ),
@@ -3,6 +3,7 @@ from datetime import datetime
 from typing import Self
 
 from sqlalchemy import *
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Mapped, mapped_column, relationship, selectinload
@@ -57,22 +58,25 @@ class Promocode(Base):
 
     @classmethod
     async def create(cls, session: AsyncSession, **kwargs: Any) -> Self | None:
-        while True:
-            code = generate_code()
-            promocode = await Promocode.get(session=session, code=code)
-            if not promocode:
-                break
-
-        promocode = Promocode(code=code, **kwargs)
-        session.add(promocode)
-
         try:
+            while True:
+                code = generate_code()
+                stmt = (
+                    sqlite_insert(Promocode)
+                    .values(code=code, **kwargs)
+                    .on_conflict_do_nothing(index_elements=[Promocode.code])
+                    .returning(Promocode)
+                )
+                promocode = await session.scalar(stmt)
+                if promocode:
+                    break
+
             await session.commit()
             logger.info(f"Promocode {promocode.code} created.")
             return promocode
         except IntegrityError as exception:
             await session.rollback()
-            logger.error(f"Error occurred while creating promocode {promocode.code}: {exception}")
+            logger.error(f"Error occurred while creating promocode {code}: {exception}")
             return None
 
     @classmethod
@@ -95,10 +99,10 @@ class Promocode(Base):
 
     @classmethod
     async def delete(cls, session: AsyncSession, code: str) -> bool:
-        promocode = await Promocode.get(session=session, code=code)
+        filter = [Promocode.code == code]
+        query = await session.execute(delete(Promocode).where(*filter).returning(Promocode.id))
 
-        if promocode:
-            await session.delete(promocode)
+        if query.first() is not None:
             await session.commit()
             logger.info(f"Promocode {code} deleted.")
             return True
@@ -3,6 +3,7 @@ from datetime import datetime
 from typing import Any, Self
 
 from sqlalchemy import *
+from sqlalchemy.engine import Row
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Mapped, mapped_column, relationship, selectinload
@@ -104,3 +105,27 @@ class Transaction(Base):
 
         logger.warning(f"Transaction {payment_id} not found for update.")
         return None
+
+    @classmethod
+    async def set_status(
+        cls,
+        session: AsyncSession,
+        payment_id: str,
+        status: TransactionStatus,
+    ) -> Row[tuple[str, int]] | None:
+        filter = [Transaction.payment_id == payment_id]
+        query = await session.execute(
+            update(Transaction)
+            .where(*filter)
+            .values(status=status)
+            .returning(Transaction.subscription, Transaction.tg_id)
+        )
+        row = query.one_or_none()
+
+        if row:
+            await session.commit()
+            logger.info(f"Transaction {payment_id} updated.")
+            return row
+
+        logger.warning(f"Transaction {payment_id} not found for update.")
+        return None
@@ -1,12 +1,40 @@
+import atexit
 import logging
+import logging.config
 import logging.handlers
 import os
+import queue
 import tarfile
+import time
 import zipfile
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
 from logging.handlers import TimedRotatingFileHandler
 
-from app.bot.utils.constants import LOG_GZ_ARCHIVE_FORMAT, LOG_ZIP_ARCHIVE_FORMAT
+try:
+    # ISA-L provides a SIMD-accelerated drop-in replacement for gzip
+    from isal import igzip as gzip
+    from isal.isal_zlib import ISAL_BEST_COMPRESSION as GZ_MAX_COMPRESSLEVEL
+except ImportError:
+    import gzip
+
+    GZ_MAX_COMPRESSLEVEL = 9
+
+try:
+    from isal import igzip_threaded
+except ImportError:
+    igzip_threaded = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+from app.bot.utils.constants import (
+    LOG_GZ_ARCHIVE_FORMAT,
+    LOG_ZIP_ARCHIVE_FORMAT,
+    LOG_ZSTD_ARCHIVE_FORMAT,
+)
 from app.config import LoggingConfig, memory_handler
 
 LOG_DIR = "app/logs"
@@ -14,9 +42,59 @@ LOG_FILENAME = "app.log"
 LOG_WHEN = "midnight"
 LOG_INTERVAL = 1
 LOG_ENCODING = "utf-8"
+LOG_ENCODING_ERRORS = "replace"
+LOG_COMPRESSLEVEL = 1
+LOG_ZSTD_LEVEL = 3
+LOG_COPY_BUFSIZE = 256 * 1024
+LOG_BUFFER_SIZE = 256 * 1024
+LOG_FLUSH_INTERVAL = 1.0
+LOG_THREADED_MIN_SIZE = 8 * 1024 * 1024
+LOG_COMPRESS_THREADS = min(4, os.cpu_count() or 1)
+
+# Suppresses logs to avoid unnecessary output
+LOG_LIBRARY_LEVELS = {
+    "aiogram.event": "CRITICAL",
+    "aiosqlite": "INFO",
+    "httpcore": "INFO",
+    "aiohttp": "WARNING",
+    "httpx": "WARNING",
+    "urllib3": "WARNING",
+    "apscheduler": "WARNING",
+}
 
 logger = logging.getLogger(__name__)
 
+# Archiving runs on a single worker so rotations are processed one at a time, in order
+_archive_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="log-archive")
+atexit.register(_archive_executor.shutdown, wait=True)
+
+# Reused by every copy, which is safe because all archiving happens on the single worker above
+_copy_buffer = bytearray(LOG_COPY_BUFSIZE)
+_copy_view = memoryview(_copy_buffer)
+
+_listener: logging.handlers.QueueListener | None = None
+
+
+class FlushingQueueListener(logging.handlers.QueueListener):
+    # Flushes the handlers whenever the queue stays idle for the flush interval, so buffered
+    # records reach the disk on a quiet bot too, not only when a later record arrives
+    def __init__(
+        self, log_queue, *handlers, respect_handler_level=False, flush_interval=LOG_FLUSH_INTERVAL
+    ):
+        super().__init__(log_queue, *handlers, respect_handler_level=respect_handler_level)
+        self.flush_interval = flush_interval
+
+    def dequeue(self, block):
+        if not block:
+            return super().dequeue(block)
+
+        while True:
+            try:
+                return self.queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                for handler in self.handlers:
+                    handler.flush()
+
 
 class ArchiveRotatingFileHandler(TimedRotatingFileHandler):
     def __init__(
@@ -31,81 +109,246 @@ class ArchiveRotatingFileHandler(TimedRotatingFileHandler):
         atTime=None,
         errors=None,
         archive_format=LOG_ZIP_ARCHIVE_FORMAT,
+        compresslevel=LOG_COMPRESSLEVEL,
+        flush_interval=LOG_FLUSH_INTERVAL,
     ):
         super().__init__(
             filename, when, interval, backupCount, encoding, delay, utc, atTime, errors
         )
-        if archive_format not in {LOG_ZIP_ARCHIVE_FORMAT, LOG_GZ_ARCHIVE_FORMAT}:
-            raise ValueError("archive_format must be either 'zip' or 'gz'")
+        if archive_format not in {
+            LOG_ZIP_ARCHIVE_FORMAT,
+            LOG_GZ_ARCHIVE_FORMAT,
+            LOG_ZSTD_ARCHIVE_FORMAT,
+        }:
+            raise ValueError("archive_format must be one of 'zip', 'gz' or 'zstd'")
+
+        if archive_format == LOG_ZSTD_ARCHIVE_FORMAT and zstandard is None:
+            raise ValueError("archive_format 'zstd' requires the zstandard package")
+
+        # zstd has its own level, compresslevel only feeds the DEFLATE based formats
+        max_compresslevel = GZ_MAX_COMPRESSLEVEL if archive_format == LOG_GZ_ARCHIVE_FORMAT else 9
+        if not 0 <= compresslevel <= max_compresslevel:
+            raise ValueError(f"compresslevel must be between 0 and {max_compresslevel}")
 
         self.archive_format = archive_format
+        self.compresslevel = compresslevel
+        self.flush_interval = flush_interval
+        self._last_flush = time.monotonic()
         logger.debug(f"Initialized ArchiveRotatingFileHandler with format: {self.archive_format}")
 
+    def _open(self):
+        return open(
+            self.baseFilename,
+            self.mode,
+            buffering=LOG_BUFFER_SIZE,
+            encoding=self.encoding,
+            errors=self.errors,
+        )
+
+    def emit(self, record: logging.LogRecord) -> None:
+        # Same as the base emit, but flushes only on warnings or once per flush interval
+        try:
+            if self.shouldRollover(record):
+                self.doRollover()
+            if self.stream is None:
+                if self.mode != "w" or not self._closed:
+                    self.stream = self._open()
+            if self.stream:
+                self.stream.write(self.format(record) + self.terminator)
+                now = time.monotonic()
+                if (
+                    record.levelno >= logging.WARNING
+                    or now - self._last_flush >= self.flush_interval
+                ):
+                    self.stream.flush()
+                    self._last_flush = now
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
     def doRollover(self) -> None:
         super().doRollover()
 
-        timestamp = datetime.now().strftime("%Y-%m-%d_%H-%M-%S")
-        dir_name = os.path.dirname(self.baseFilename)
-        archive_name = os.path.join(dir_name, f"{timestamp}.{self.archive_format}")
+        files_to_archive = self.getFilesToDelete()
+        if not files_to_archive:
+            return
+
+        _archive_executor.submit(self._archive_rotated_logs, sorted(files_to_archive))
+
+    def _archive_rotated_logs(self, files: list[str]) -> None:
+        # Includes logs left over by earlier failed attempts, each one is removed only once
+        # its own archive is in place
+        for log_file in files:
+            try:
+                if self._archive_log_file(log_file):
+                    self._remove_old_logs([log_file])
+            except Exception as exception:
+                logger.error("Error archiving %s: %s", log_file, exception)
+
+    def _archive_log_file(self, log_file: str) -> bool:
+        try:
+            stat = os.stat(log_file)
+        except FileNotFoundError:
+            logger.warning("Log file %s does not exist, skipping archive.", log_file)
+            return False
+
+        if stat.st_size == 0:
+            logger.debug("Log file %s is empty, skipping archive.", log_file)
+            return True
 
-        self._archive_log_file(archive_name)
-        self._remove_old_logs()
+        archive_name = self._get_archive_name(stat.st_mtime)
+        logger.info("Archiving %s to %s", log_file, archive_name)
 
-    def _archive_log_file(self, archive_name: str) -> None:
-        logger.info(f"Archiving {self.baseFilename} to {archive_name}")
-        if os.path.exists(self.baseFilename):
+        # Write under a temporary name so a partial archive never replaces a complete one
+        partial_name = f"{archive_name}.part"
+        arcname = self._get_log_filename(archive_name)
+        try:
             if self.archive_format == LOG_ZIP_ARCHIVE_FORMAT:
-                self._archive_to_zip(archive_name)
+                self._archive_to_zip(log_file, partial_name, arcname, stat)
             elif self.archive_format == LOG_GZ_ARCHIVE_FORMAT:
-                self._archive_to_gz(archive_name)
-        else:
-            logger.warning(f"Log file {self.baseFilename} does not exist, skipping archive.")
+                self._archive_to_gz(log_file, partial_name, arcname, stat)
+            elif self.archive_format == LOG_ZSTD_ARCHIVE_FORMAT:
+                self._archive_to_zstd(log_file, partial_name, arcname, stat)
+            os.replace(partial_name, archive_name)
+        except Exception:
+            if os.path.exists(partial_name):
+                os.remove(partial_name)
+            raise
+        return True
+
+    def _get_archive_name(self, mtime: float) -> str:
+        # Named after the last write to the log, so leftovers archived later keep their own time
+        moment = datetime.fromtimestamp(mtime, timezone.utc if self.utc else None)
+        base_name = os.path.join(
+            os.path.dirname(self.baseFilename), moment.strftime("%Y-%m-%d_%H-%M-%S")
+        )
+
+        archive_name = f"{base_name}.{self.archive_format}"
+        index = 1
+        while os.path.exists(archive_name):
+            archive_name = f"{base_name}_{index}.{self.archive_format}"
+            index += 1
+        return archive_name
+
+    def _archive_to_zip(
+        self, log_file: str, archive_name: str, arcname: str, stat: os.stat_result
+    ) -> None:
+        # Describe the member from the known stat instead of letting zipfile look it up again
+        to_time = time.gmtime if self.utc else time.localtime
+        member_info = zipfile.ZipInfo(arcname, date_time=to_time(stat.st_mtime)[:6])
+        member_info.compress_type = zipfile.ZIP_DEFLATED
+        member_info._compresslevel = self.compresslevel
+        member_info.file_size = stat.st_size
 
-    def _archive_to_zip(self, archive_name: str) -> None:
-        log = self.getFilesToDelete()[0]
-        new_log_name = self._get_log_filename(archive_name)
         with zipfile.ZipFile(archive_name, "w", zipfile.ZIP_DEFLATED) as archive:
-            archive.write(filename=log, arcname=new_log_name)
+            with open(log_file, "rb") as source, archive.open(
+                member_info, "w", force_zip64=stat.st_size >= zipfile.ZIP64_LIMIT
+            ) as member:
+                while size := source.readinto(_copy_buffer):
+                    member.write(_copy_view[:size])
 
-    def _archive_to_gz(self, archive_name: str) -> None:
-        log = self.getFilesToDelete()[0]
-        new_log_name = self._get_log_filename(archive_name)
-        with tarfile.open(archive_name, "w:gz") as archive:
-            archive.add(name=log, arcname=new_log_name)
+    def _archive_to_gz(
+        self, log_file: str, archive_name: str, arcname: str, stat: os.stat_result
+    ) -> None:
+        # Large logs are compressed on several threads, small ones are not worth the startup
+        if igzip_threaded and stat.st_size >= LOG_THREADED_MIN_SIZE:
+            compressed = igzip_threaded.open(
+                archive_name,
+                "wb",
+                compresslevel=self.compresslevel,
+                threads=LOG_COMPRESS_THREADS,
+            )
+        else:
+            compressed = gzip.open(archive_name, "wb", compresslevel=self.compresslevel)
+
+        # The threaded writer cannot tell(), so write the tar as a stream, which never asks
+        with compressed:
+            with tarfile.open(
+                fileobj=compressed,
+                mode="w|",
+                bufsize=LOG_COPY_BUFSIZE,
+                copybufsize=LOG_COPY_BUFSIZE,
+            ) as archive:
+                archive.add(name=log_file, arcname=arcname)
+
+    def _archive_to_zstd(
+        self, log_file: str, archive_name: str, arcname: str, stat: os.stat_result
+    ) -> None:
+        # Same threshold as gz: worker threads only pay off for large logs
+        threads = LOG_COMPRESS_THREADS if stat.st_size >= LOG_THREADED_MIN_SIZE else 0
+        compressor = zstandard.ZstdCompressor(level=LOG_ZSTD_LEVEL, threads=threads)
+
+        with open(archive_name, "wb") as destination:
+            with compressor.stream_writer(destination) as compressed:
+                with tarfile.open(
+                    fileobj=compressed, mode="w", copybufsize=LOG_COPY_BUFSIZE
+                ) as archive:
+                    archive.add(name=log_file, arcname=arcname)
 
     def _get_log_filename(self, archive_name: str) -> str:
         return os.path.splitext(os.path.basename(archive_name))[0] + ".log"
 
-    def _remove_old_logs(self) -> None:
-        files_to_delete = self.getFilesToDelete()
-        logger.debug(f"Removing old log files: {files_to_delete}")
+    def _remove_old_logs(self, files_to_delete: list[str]) -> None:
+        logger.debug("Removing old log files: %s", files_to_delete)
         for file in files_to_delete:
             if os.path.exists(file):
                 try:
                     os.remove(file)
-                    logger.debug(f"Successfully deleted old log file: {file}")
+                    logger.debug("Successfully deleted old log file: %s", file)
                 except Exception as exception:
-                    logger.error(f"Error deleting {file}: {exception}")
+                    logger.error("Error deleting %s: %s", file, exception)
+
+
+def stop_logging() -> None:
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+    # Let a rotation that is still being archived finish
+    _archive_executor.shutdown(wait=True)
 
 
 def setup_logging(config: LoggingConfig) -> None:
     os.makedirs(LOG_DIR, exist_ok=True)
     log_file = os.path.join(LOG_DIR, LOG_FILENAME)
 
-    logging.basicConfig(
-        level=getattr(logging, config.LEVEL.upper(), logging.INFO),
-        format=config.FORMAT,
-        handlers=[
-            ArchiveRotatingFileHandler(
-                filename=log_file,
-                when=LOG_WHEN,
-                interval=LOG_INTERVAL,
-                encoding=LOG_ENCODING,
-                archive_format=config.ARCHIVE_FORMAT,
-            ),
-            logging.StreamHandler(),
-        ],
+    formatter = logging.Formatter(config.FORMAT)
+    file_handler = ArchiveRotatingFileHandler(
+        filename=log_file,
+        when=LOG_WHEN,
+        interval=LOG_INTERVAL,
+        encoding=LOG_ENCODING,
+        errors=LOG_ENCODING_ERRORS,
+        archive_format=config.ARCHIVE_FORMAT,
     )
+    stream_handler = logging.StreamHandler()
+    for handler in (file_handler, stream_handler):
+        handler.setFormatter(formatter)
+
+    # Callers only enqueue records, the listener thread formats and writes them
+    global _listener
+    log_queue = queue.SimpleQueue()
+    _listener = FlushingQueueListener(
+        log_queue,
+        file_handler,
+        stream_handler,
+        respect_handler_level=True,
+        flush_interval=LOG_FLUSH_INTERVAL,
+    )
+    _listener.start()
+    atexit.register(stop_logging)
+
+    level = logging.getLevelNamesMapping().get(config.LEVEL.upper(), logging.INFO)
+    logging.config.dictConfig(
+        {
+            "version": 1,
+            "incremental": True,
+            "root": {"level": level},
+            "loggers": {name: {"level": value} for name, value in LOG_LIBRARY_LEVELS.items()},
+        }
+    )
+    logging.getLogger().addHandler(logging.handlers.QueueHandler(log_queue))
 
     for record in memory_handler.buffer:
         logger.handle(record)
@@ -114,25 +357,3 @@ def setup_logging(config: LoggingConfig) -> None:
         f"Logging configuration: level={config.LEVEL}, "
         f"format={config.FORMAT}, archive_format={config.ARCHIVE_FORMAT}"
     )
-
-    # Suppresses logs to avoid unnecessary output
-    aiogram_logger = logging.getLogger("aiogram.event")
-    aiogram_logger.setLevel(logging.CRITICAL)
-
-    aiosqlite_logger = logging.getLogger("aiosqlite")
-    aiosqlite_logger.setLevel(logging.INFO)
-
-    httpcore_logger = logging.getLogger("httpcore")
-    httpcore_logger.setLevel(logging.INFO)
-
-    aiohttp_logger = logging.getLogger("aiohttp")
-    aiohttp_logger.setLevel(logging.WARNING)
-
-    httpx_logger = logging.getLogger("httpx")
-    httpx_logger.setLevel(logging.WARNING)
-
-    urllib_logger = logging.getLogger("urllib3")
-    urllib_logger.setLevel(logging.WARNING)
-
-    apscheduler_logger = logging.getLogger("apscheduler")
-    apscheduler_logger.setLevel(logging.WARNING)
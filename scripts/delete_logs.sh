@@ -2,7 +2,8 @@
 
 # delete_logs.sh
 # -----------------------------------------------------------------------------
-# Script to delete .log, .zip, and .gz files from a specified directory.
+# Script to delete logs (including rotated ones), archives (.zip, .gz, .zstd) and
+# partial archives (.part) from a specified directory.
 #
 # Options:
 #     --dir PATH   Specify the directory to clean logs and archives from (default: app/logs).
@@ -40,10 +41,11 @@ while [[ $# -gt 0 ]]; do
 done
 
 if [[ -d "$LOG_DIR" ]]; then
-    echo "🔍 Searching for .log, .zip, and .gz files in: $LOG_DIR"
+    echo "🔍 Searching for log, archive and partial archive files in: $LOG_DIR"
 
-    if find "$LOG_DIR" -type f \( -name "*.log" -o -name "*.zip" -o -name "*.gz" \) -exec rm -f {} +; then
-        echo "✅ All .log, .zip, and .gz files were successfully deleted from: $LOG_DIR"
+    if find "$LOG_DIR" -type f \( -name "*.log" -o -name "*.log.*" -o -name "*.zip" -o -name "*.gz" \
+        -o -name "*.zstd" -o -name "*.part" \) -exec rm -f {} +; then
+        echo "✅ All log, archive and partial archive files were successfully deleted from: $LOG_DIR"
     else
         echo "❌ Failed to delete some files." >&2
         exit 1